@@ -6,8 +6,10 @@ import sys
 import os
 import pytest
 
-# Ajouter le chemin parent pour les imports relatifs
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Ajouter le chemin parent pour les imports relatifs (une seule fois)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 
 # Import avec chemin relatif
 try:
@@ -18,7 +20,7 @@ except ImportError:
     import importlib.util
     spec = importlib.util.spec_from_file_location(
         "transpiler",
-        os.path.join(os.path.dirname(__file__), "..", "zenv_transpiler", "transpiler.py")
+        os.path.join(_PROJECT_ROOT, "zenv_transpiler", "transpiler.py")
     )
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)
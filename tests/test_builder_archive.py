@@ -0,0 +1,77 @@
+"""
+Tests de l'archive produite par ZenvBuilder.build
+"""
+
+import sys
+import os
+import io
+import tarfile
+
+import pytest
+
+# Ajouter le chemin parent pour les imports relatifs (une seule fois)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from zenv.builder import ZenvBuilder
+from zenv.utils import archive
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "package.zcf").write_text(
+        "[Zenv]\nname = demo\nversion = 1.0.0\n\n[File-build]\nfiles = *.zv\n        shared.py\n"
+    )
+    (project / "main.zv").write_text('print("main")\n')
+    monkeypatch.chdir(project)
+    return project
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt",
+                    reason="liens symboliques indisponibles")
+def test_symlinked_source_is_stored_as_content(project, tmp_path):
+    """Un fichier source lié est archivé avec son contenu, pas comme lien"""
+    outside = tmp_path / "outside.py"
+    outside.write_text("VALUE = 42\n")
+    # Lien absolu vers un fichier hors du projet
+    (project / "shared.py").symlink_to(outside)
+    (project / "alias.zv").symlink_to(project / "main.zv")
+
+    package_file = ZenvBuilder().build()
+    assert package_file
+
+    with tarfile.open(package_file, "r:gz") as tar:
+        members = {member.name: member for member in tar.getmembers()}
+        assert members["shared.py"].isfile()
+        assert members["alias.zv"].isfile()
+        assert tar.extractfile("shared.py").read() == b"VALUE = 42\n"
+
+    # L'archive s'installe (le filtre 'data' refuse les liens sortants)
+    dest = tmp_path / "installed"
+    archive.extract(package_file, dest)
+    assert (dest / "shared.py").read_text() == "VALUE = 42\n"
+    assert (dest / "alias.zv").read_text() == 'print("main")\n'
+
+
+def test_source_date_epoch_is_reproducible(project, monkeypatch):
+    """Même SOURCE_DATE_EPOCH, mêmes sources : archive identique octet pour octet"""
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    first = open(ZenvBuilder().build(), "rb").read()
+    # Sources retouchées après la date fixée : leur mtime est ramené à celle-ci
+    os.utime(project / "main.zv", (1800000000, 1800000000))
+    second = open(ZenvBuilder().build(), "rb").read()
+    assert first == second
+
+    with tarfile.open(fileobj=io.BytesIO(second), mode="r:gz") as tar:
+        assert {member.mtime for member in tar.getmembers()} == {1700000000}
+
+
+@pytest.mark.parametrize("value", ["", "now", "-5"])
+def test_invalid_source_date_epoch_falls_back(project, monkeypatch, capsys, value):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", value)
+    assert ZenvBuilder().build()
+    out = capsys.readouterr().out
+    assert ("Ignoring SOURCE_DATE_EPOCH" in out) == bool(value)
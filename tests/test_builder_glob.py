@@ -0,0 +1,105 @@
+"""
+Tests de la résolution des motifs glob du builder (ZenvBuilder._glob_files)
+"""
+
+import sys
+import os
+import warnings
+from pathlib import Path
+
+import pytest
+
+# Ajouter le chemin parent pour les imports relatifs (une seule fois)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from zenv.builder import ZenvBuilder
+
+
+def _touch(root, *paths):
+    for rel in paths:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+
+def _glob(pattern):
+    """Résultat de référence : Path.glob, fichiers uniquement"""
+    return sorted({p for p in Path('.').glob(pattern) if p.is_file()})
+
+
+def _builder_glob(pattern):
+    return sorted(ZenvBuilder()._glob_files([pattern])[pattern])
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    _touch(
+        project,
+        "main.zv",
+        "lib.zv",
+        "README.md",
+        ".hidden.zv",
+        "src/a.py",
+        "src/b.zv",
+        "src/pkg/c.py",
+        "src/pkg/deep/d.py",
+        "[x].zv",
+        "node_modules/mod/index.py",
+        "__pycache__/cache.py",
+    )
+    _touch(tmp_path, "other/shared.zv")
+    monkeypatch.chdir(project)
+    return project
+
+
+class TestGlobLikePathGlob:
+    """Les motifs donnent les mêmes fichiers que Path.glob de l'interpréteur"""
+
+    @pytest.mark.parametrize("pattern", [
+        "*.zv",
+        "./*.zv",
+        "src/*.py",
+        "src/*/*.py",
+        "src/**/*.py",
+        "*/pkg/*.py",
+        "s?c/*.zv",
+        "[!m]*.zv",
+        "[[]x].zv",
+        "src/**/deep/*.py",
+        "missing/*.py",
+        "**/*.py",
+        "*/*.py",
+        "node_modules/**/*.py",
+        "__pycache__/*.py",
+        "../other/*.zv",
+        # Python >= 3.13 : un '**' final désigne aussi les fichiers
+        "**",
+        "src/**",
+    ])
+    def test_same_as_path_glob(self, tree, pattern):
+        assert _builder_glob(pattern) == _glob(pattern)
+
+    def test_bracket_class_no_warning(self, tree):
+        """'[[]' ne déclenche pas de FutureWarning (ensemble imbriqué)"""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            assert _builder_glob("[[]x].zv") == [Path("[x].zv")]
+
+    def test_no_directory_is_pruned(self, tree):
+        """node_modules, __pycache__... restent inclus, comme avec Path.glob"""
+        found = _builder_glob("**/*.py")
+        assert Path("node_modules/mod/index.py") in found
+        assert Path("__pycache__/cache.py") in found
+
+
+def test_repeated_pattern_globbed_once(tree):
+    """Chaque motif reçoit ses propres correspondances, sans doublons"""
+    patterns = ["*.zv", "src/**/*.py", "*.zv"]
+    result = ZenvBuilder()._glob_files(patterns)
+    assert list(result) == ["*.zv", "src/**/*.py"]
+    assert result["*.zv"] == _glob("*.zv")
+    assert result["src/**/*.py"] == _glob("src/**/*.py")
+    assert len(set(result["src/**/*.py"])) == len(result["src/**/*.py"])
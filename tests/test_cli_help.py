@@ -0,0 +1,36 @@
+"""
+Tests de l'aide générale du CLI : le texte statique suit argparse
+"""
+
+import sys
+import os
+
+import pytest
+
+# Ajouter le chemin parent pour les imports relatifs (une seule fois)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from zenv.cli import ZenvCLI, _HELP_TEXT, _HELP_TEXT_COLUMNS, _build_parser
+
+
+@pytest.mark.parametrize("columns", [_HELP_TEXT_COLUMNS, 80, 200])
+def test_help_text_matches_argparse(monkeypatch, columns):
+    """_HELP_TEXT est identique à la sortie d'argparse à partir de _HELP_TEXT_COLUMNS"""
+    monkeypatch.setenv("COLUMNS", str(columns))
+    assert _build_parser().format_help() == _HELP_TEXT + "\n"
+
+
+@pytest.mark.parametrize("args", [[], ["-h"], ["--help"]])
+def test_help_fast_path(monkeypatch, capsys, args):
+    monkeypatch.setenv("COLUMNS", "80")
+    assert ZenvCLI().run(args) == 0
+    assert capsys.readouterr().out == _HELP_TEXT + "\n"
+
+
+def test_help_narrow_terminal(monkeypatch, capsys):
+    """Terminal étroit : argparse replie les lignes lui-même"""
+    monkeypatch.setenv("COLUMNS", str(_HELP_TEXT_COLUMNS - 20))
+    assert ZenvCLI().run(["--help"]) == 0
+    assert capsys.readouterr().out == _build_parser().format_help()
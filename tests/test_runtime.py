@@ -0,0 +1,144 @@
+"""
+Tests du runtime : exécution des scripts dans le processus zenv
+"""
+
+import sys
+import os
+import zipapp
+
+import pytest
+
+# Ajouter le chemin parent pour les imports relatifs (une seule fois)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from zenv.runtime import ZenvRuntime
+
+
+def _script(tmp_path, source, name="script.py"):
+    path = tmp_path / name
+    path.write_text(source)
+    return str(path)
+
+
+class TestInterpreterState:
+    """sys.argv, sys.path et __main__ sont rétablis après l'exécution"""
+
+    def test_state_restored(self, tmp_path):
+        script = _script(tmp_path, (
+            "import sys\n"
+            "sys.argv.append('extra')\n"
+            "sys.path.append('/nowhere')\n"
+            "RESULT = 1\n"
+        ))
+        argv, path, main = sys.argv[:], sys.path[:], sys.modules.get('__main__')
+        assert ZenvRuntime().execute(script, ["a"]) == 0
+        assert sys.argv == argv
+        assert sys.path == path
+        assert sys.modules.get('__main__') is main
+
+    def test_state_restored_after_error(self, tmp_path, capsys):
+        script = _script(tmp_path, "import sys\nsys.path.insert(0, '/nowhere')\nraise RuntimeError('x')\n")
+        argv, path, main = sys.argv[:], sys.path[:], sys.modules.get('__main__')
+        assert ZenvRuntime().execute(script) == 1
+        assert (sys.argv, sys.path, sys.modules.get('__main__')) == (argv, path, main)
+
+    def test_script_sees_its_arguments(self, tmp_path, capsys):
+        script = _script(tmp_path, (
+            "import sys\n"
+            "print(sys.argv)\n"
+            "print(__name__, sys.path[0])\n"
+        ))
+        assert ZenvRuntime().execute(script, ["a", "b"]) == 0
+        out = capsys.readouterr().out.splitlines()
+        assert out[0] == str([script, "a", "b"])
+        assert out[1] == f"__main__ {tmp_path.resolve()}"
+
+
+class TestExitCodes:
+
+    @pytest.mark.parametrize("source, code", [
+        ("pass\n", 0),
+        ("import sys\nsys.exit()\n", 0),
+        ("import sys\nsys.exit(0)\n", 0),
+        ("import sys\nsys.exit(3)\n", 3),
+        ("raise SystemExit(42)\n", 42),
+    ])
+    def test_system_exit_code(self, tmp_path, source, code):
+        assert ZenvRuntime().execute(_script(tmp_path, source)) == code
+
+    def test_system_exit_message(self, tmp_path, capsys):
+        """sys.exit('msg') affiche le message sur stderr et renvoie 1, comme python"""
+        assert ZenvRuntime().execute(_script(tmp_path, "import sys\nsys.exit('fatal')\n")) == 1
+        assert capsys.readouterr().err == "fatal\n"
+
+    def test_keyboard_interrupt(self, tmp_path):
+        assert ZenvRuntime().execute(_script(tmp_path, "raise KeyboardInterrupt\n")) == 130
+
+
+class TestErrors:
+
+    def test_traceback_starts_in_user_code(self, tmp_path, capsys):
+        script = _script(tmp_path, (
+            "def fail():\n"
+            "    raise ValueError('boom')\n"
+            "fail()\n"
+        ))
+        assert ZenvRuntime().execute(script) == 1
+        err = capsys.readouterr().err
+        assert err.startswith("Traceback (most recent call last):")
+        assert script in err
+        assert "ValueError: boom" in err
+        assert "runtime.py" not in err
+        assert "runpy" not in err
+
+    def test_syntax_error(self, tmp_path, capsys):
+        assert ZenvRuntime().execute(_script(tmp_path, "def (:\n")) == 1
+        assert "SyntaxError" in capsys.readouterr().err
+
+    def test_missing_file(self, tmp_path, capsys):
+        assert ZenvRuntime().execute(str(tmp_path / "missing.py")) == 1
+        assert "File not found" in capsys.readouterr().out
+
+
+@pytest.fixture
+def no_assert_rewrite(monkeypatch):
+    """pytest.ini collecte *.py : le hook de réécriture d'assertions réclamerait
+    les __main__.py temporaires sans fournir get_code() à runpy"""
+    monkeypatch.setattr(sys, "meta_path", [
+        finder for finder in sys.meta_path
+        if type(finder).__name__ != "AssertionRewritingHook"
+    ])
+
+
+class TestTargets:
+    """Fichier .zv, répertoire avec __main__.py et zipapp"""
+
+    def test_zv_file(self, tmp_path, capsys):
+        script = _script(tmp_path, "import sys\nprint('zv', sys.argv[1:], __file__)\n", "app.zv")
+        assert ZenvRuntime().execute(script, ["x"]) == 0
+        # __file__ désigne la source .zv (voir ZenvRuntime._execute_zv)
+        assert capsys.readouterr().out == f"zv ['x'] {script}\n"
+
+    def test_directory(self, tmp_path, capsys, no_assert_rewrite):
+        app = tmp_path / "app"
+        app.mkdir()
+        (app / "helper.py").write_text("VALUE = 'dir'\n")
+        (app / "__main__.py").write_text("import helper\nprint(helper.VALUE)\n")
+        assert ZenvRuntime().execute(str(app)) == 0
+        sys.modules.pop("helper", None)
+        assert capsys.readouterr().out == "dir\n"
+
+    def test_directory_without_main(self, tmp_path, capsys):
+        assert ZenvRuntime().execute(str(tmp_path)) == 1
+        assert "__main__" in capsys.readouterr().out
+
+    def test_zipapp(self, tmp_path, capsys, no_assert_rewrite):
+        source = tmp_path / "src"
+        source.mkdir()
+        (source / "__main__.py").write_text("import sys\nprint('zip', sys.argv[1:])\n")
+        target = tmp_path / "app.pyz"
+        zipapp.create_archive(source, target)
+        assert ZenvRuntime().execute(str(target), ["y"]) == 0
+        assert capsys.readouterr().out == "zip ['y']\n"
@@ -7,11 +7,6 @@ __version__ = "2.1.7"
 __author__ = "Zenv Team"
 __license__ = "MIT"
 
-from .transpiler import ZenvTranspiler
-from .runtime import ZenvRuntime
-from .builder import ZenvBuilder
-from .cli import ZenvCLI
-
 __all__ = [
     'ZenvTranspiler',
     'ZenvRuntime', 
@@ -22,6 +17,27 @@ __all__ = [
     'compile'
 ]
 
+# Submodules are resolved on first access so that the `zenv` console script
+# only pays for the CLI import, not the whole package.
+_LAZY_ATTRS = {
+    'ZenvTranspiler': '.transpiler',
+    'ZenvRuntime': '.runtime',
+    'ZenvBuilder': '.builder',
+    'ZenvCLI': '.cli',
+}
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 def execute(source: str, args: list = None):
     """Execute Zenv code directly"""
     from .runtime import ZenvRuntime
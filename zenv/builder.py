@@ -1,33 +1,31 @@
-import configparser
-import json
-import tarfile
-import hashlib
-import shutil
+from __future__ import annotations
+
 import os
 from pathlib import Path
-from typing import Dict, List, Optional
-import datetime
 
 class ZenvManifest:
     
     def __init__(self, manifest_path: str):
+        import configparser
         self.path = Path(manifest_path)
-        self.config = configparser.ConfigParser()
+        self.config = configparser.ConfigParser(interpolation=None)
         self.config.read(manifest_path)
+        # [Zenv] is consulted for several fields; snapshot it once
+        self.info = dict(self.config['Zenv']) if self.config.has_section('Zenv') else {}
     
-    def parse(self) -> Dict:
+    def parse(self) -> dict:
         result = {}
         for section in self.config.sections():
             result[section] = dict(self.config[section])
         return result
     
     def get_name(self) -> str:
-        return self.config.get('Zenv', 'name', fallback='unknown')
+        return self.info.get('name', 'unknown')
     
     def get_version(self) -> str:
-        return self.config.get('Zenv', 'version', fallback='0.0.0')
+        return self.info.get('version', '0.0.0')
     
-    def get_dependencies(self) -> Dict:
+    def get_dependencies(self) -> dict:
         deps = {'zv': {}, 'py': {}}
         if self.config.has_section('dep.zv'):
             deps['zv'] = dict(self.config['dep.zv'])
@@ -35,23 +33,27 @@ class ZenvManifest:
             deps['py'] = dict(self.config['dep.py'])
         return deps
     
-    def get_files(self) -> List[str]:
-        files = []
-        if self.config.has_section('File-build'):
-            for key in self.config['File-build']:
-                value = self.config['File-build'][key]
-                if '\n' in value:
-                    files.extend([f.strip() for f in value.split('\n') if f.strip()])
-                else:
-                    files.append(value.strip())
-        return files
+    def get_files(self) -> list[str]:
+        if not self.config.has_section('File-build'):
+            return []
+        section = self.config['File-build']
+        return [
+            entry.strip()
+            for value in section.values()
+            for entry in value.splitlines()
+            if entry.strip()
+        ]
 
 class ZenvBuilder:
     
+    # Fast gzip by default; override with ZENV_COMPRESSLEVEL (0-9)
+    COMPRESS_LEVEL = 1
+    
     def __init__(self):
         self.version = "1.0.0"
     
     def build(self, manifest_file: str = "package.zcf", output_dir: str = "dist") -> str:
+        import time
         print(f"🔨 Building package from: {manifest_file}")
         
         try:
@@ -66,52 +68,48 @@ class ZenvBuilder:
             # Create package file name - CORRIGÉ: .zv au lieu de .zc.gs
             package_file = output_path / f"{package_name}-{package_version}.zv"
             
-            # Create temp directory
-            import tempfile
-            with tempfile.TemporaryDirectory() as tmpdir:
-                tmp_path = Path(tmpdir)
-                
-                # Copy files from manifest
-                files = manifest.get_files()
-                print(f"📄 Files to include: {files}")
-                
-                for file_pattern in files:
-                    if '*' in file_pattern:
-                        # Glob pattern
-                        for file_path in Path('.').glob(file_pattern.strip()):
-                            if file_path.is_file():
-                                dest_file = tmp_path / file_path.name
-                                shutil.copy2(file_path, dest_file)
-                                print(f"  ✓ Copied: {file_path}")
-                    else:
-                        # Single file
-                        file_path = Path(file_pattern.strip())
-                        if file_path.exists():
-                            dest_file = tmp_path / file_path.name
-                            shutil.copy2(file_path, dest_file)
-                            print(f"  ✓ Copied: {file_path}")
-                
-                # Create metadata
-                metadata = {
-                    'name': package_name,
-                    'version': package_version,
-                    'dependencies': manifest.get_dependencies(),
-                    'build_date': str(datetime.datetime.now()),
-                    'builder_version': self.version,
-                    'files': [f.name for f in tmp_path.iterdir() if f.is_file()]
-                }
-                
-                with open(tmp_path / "metadata.json", "w") as f:
-                    json.dump(metadata, f, indent=2)
-                
-                # Create archive - CORRIGÉ: .gz simple au lieu de .zc.gs
-                self._create_archive(tmp_path, package_file)
-                
-                # Calculate hash
-                file_hash = self._calculate_hash(package_file)
-                hash_file = package_file.with_suffix('.sha256')
-                with open(hash_file, "w") as f:
-                    f.write(f"{file_hash}  {package_file.name}")
+            # Collect files from manifest (archive name -> source path)
+            files = manifest.get_files()
+            print(f"📄 Files to include: {files}")
+            
+            # Each distinct glob pattern is expanded once
+            globbed = self._glob_files([f.strip() for f in files if '*' in f])
+            
+            sources = {}
+            for file_pattern in files:
+                if '*' in file_pattern:
+                    # Glob pattern
+                    for file_path in globbed[file_pattern.strip()]:
+                        sources[file_path.name] = file_path
+                        print(f"  ✓ Added: {file_path}")
+                else:
+                    # Single file
+                    file_path = Path(file_pattern.strip())
+                    if file_path.is_file():
+                        sources[file_path.name] = file_path
+                        print(f"  ✓ Added: {file_path}")
+            
+            # One timestamp per build, used for metadata, member mtimes and gzip header
+            build_time = self._build_time()
+            
+            # Create metadata
+            metadata = {
+                'name': package_name,
+                'version': package_version,
+                'dependencies': manifest.get_dependencies(),
+                'build_date': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(build_time)),
+                'builder_version': self.version,
+                'files': list(sources)
+            }
+            
+            # Create archive - CORRIGÉ: .gz simple au lieu de .zc.gs
+            self._create_archive(sources, metadata, package_file, build_time)
+            
+            # Calculate hash
+            file_hash = self._calculate_hash(package_file)
+            hash_file = package_file.with_suffix('.sha256')
+            with open(hash_file, "w") as f:
+                f.write(f"{file_hash}  {package_file.name}")
             
             print(f"✅ Package built: {package_file}")
             print(f"📦 Size: {package_file.stat().st_size / 1024:.1f} KB")
@@ -125,17 +123,80 @@ class ZenvBuilder:
             traceback.print_exc()
             return ""
     
-    def _create_archive(self, source_dir: Path, output_path: Path):
-        """Create .tar.gz archive"""
-        with tarfile.open(output_path, "w:gz") as tar:
-            for file_path in source_dir.rglob("*"):
-                if file_path.is_file():
-                    arcname = file_path.relative_to(source_dir)
-                    tar.add(file_path, arcname=str(arcname))
+    def _glob_files(self, patterns: list[str]) -> dict[str, list[Path]]:
+        """Files matched by each Path.glob pattern, de-duplicated and sorted"""
+        matches: dict[str, list[Path]] = {}
+        for pattern in patterns:
+            if pattern not in matches:
+                matches[pattern] = sorted(p for p in set(Path('.').glob(pattern)) if p.is_file())
+        return matches
+    
+    def _create_archive(self, sources: dict[str, Path], metadata: dict,
+                        output_path: Path, mtime: int) -> None:
+        """Create .tar.gz archive straight from the source files
+        
+        Member mtimes are clamped to mtime and the gzip header records mtime,
+        so the same sources and SOURCE_DATE_EPOCH give the same archive.
+        """
+        import gzip
+        import io
+        import tarfile
+        from .utils import jsonio
+        # metadata.json is only machine-read, so it is written compact
+        payload = jsonio.dumps(metadata)
+        
+        def clamp(info: tarfile.TarInfo) -> tarfile.TarInfo:
+            info.mtime = min(info.mtime, mtime)
+            return info
+        
+        # dereference: a symlinked source is stored as its content, since
+        # installs reject links that are absolute or leave the package
+        with open(output_path, 'wb') as raw, \
+                gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=self._compress_level(), mtime=mtime) as gz, \
+                tarfile.open(fileobj=gz, mode='w', dereference=True) as tar:
+            for arcname, file_path in sources.items():
+                tar.add(str(file_path), arcname=arcname, filter=clamp)
+            
+            info = tarfile.TarInfo("metadata.json")
+            info.size = len(payload)
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(payload))
+    
+    def _build_time(self) -> int:
+        """SOURCE_DATE_EPOCH when it is a valid timestamp, else the current time"""
+        import time
+        value = os.environ.get("SOURCE_DATE_EPOCH", "").strip()
+        if value:
+            try:
+                build_time = int(value)
+            except ValueError:
+                build_time = -1
+            if build_time >= 0:
+                return build_time
+            print(f"⚠️  Ignoring SOURCE_DATE_EPOCH={value!r} (expected a non-negative integer)")
+        return int(time.time())
+    
+    def _compress_level(self) -> int:
+        """ZENV_COMPRESSLEVEL when it is a gzip level (0-9), else COMPRESS_LEVEL"""
+        value = os.environ.get("ZENV_COMPRESSLEVEL", "").strip()
+        if not value:
+            return self.COMPRESS_LEVEL
+        try:
+            level = int(value)
+        except ValueError:
+            level = -1
+        if not 0 <= level <= 9:
+            print(f"⚠️  Ignoring ZENV_COMPRESSLEVEL={value!r} (expected 0-9), using {self.COMPRESS_LEVEL}")
+            return self.COMPRESS_LEVEL
+        return level
     
     def _calculate_hash(self, file_path: Path) -> str:
-        sha256_hash = hashlib.sha256()
+        import hashlib
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            # Python < 3.11: hash in 1 MiB chunks
+            sha256_hash = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1 << 20), b""):
                 sha256_hash.update(chunk)
         return sha256_hash.hexdigest()
@@ -1,103 +1,258 @@
-import argparse
-import sys
+import functools
 import os
-import json
-import tarfile
-import tempfile
-import shutil
-import subprocess
+import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import IO, TYPE_CHECKING, Any, Dict, List, Optional
 
 from . import __version__
-from .transpiler import ZenvTranspiler
-from .runtime import ZenvRuntime
-from .builder import ZenvBuilder
-from .utils.hub_client import ZenvHubClient
+
+if TYPE_CHECKING:
+    import argparse
+
+# Manifeste généré par `zenv build --n <name>`
+_MANIFEST_TEMPLATE = """[Zenv]
+name = {name}
+version = 1.0.0
+author = Zenv User
+description = A Zenv package
+
+[File-build]
+files = *.zv
+        *.py
+        README.md
+        LICENSE*
+
+[docs]
+description = README.md
+
+[license]
+file = LICENSE*
+"""
+
+# argparse < 3.10 intitule la section "optional arguments"
+_OPTIONS_TITLE = "options" if sys.version_info >= (3, 10) else "optional arguments"
+
+# Aide générale servie sans argparse pour `zenv`, `zenv -h` et `zenv --help`
+# (à tenir à jour avec _SUBPARSERS ; tests/test_cli_help.py les compare)
+_HELP_TEXT = """usage: zenv [-h] {run,transpile,build,pkg,hub,version,site} ...
+
+positional arguments:
+  {run,transpile,build,pkg,hub,version,site}
+                        Commands
+    run                 Run Zenv file
+    transpile           Transpile to Python
+    build               Build package
+    pkg                 Package management
+    hub                 Zenv Hub
+    version             Show version
+    site                Install to site directory
+
+%s:
+  -h, --help            show this help message and exit""" % _OPTIONS_TITLE
+
+# En dessous de cette largeur, argparse replie les lignes autrement
+_HELP_TEXT_COLUMNS = 65
+
+def _terminal_columns() -> int:
+    """Largeur vue par argparse, calculée comme shutil.get_terminal_size (sans l'importer)"""
+    try:
+        columns = int(os.environ["COLUMNS"])
+    except (KeyError, ValueError):
+        columns = 0
+    if columns <= 0:
+        try:
+            columns = os.get_terminal_size().columns
+        except OSError:
+            columns = 0
+    return columns or 80
+
+# Un constructeur par sous-commande : seul celui de la commande invoquée
+# est exécuté, l'arbre complet n'est construit que pour l'aide générale.
+# Tous acceptent `action`, utilisé seulement par pkg et hub
+def _add_run_parser(subparsers, action=None):
+    run_parser = subparsers.add_parser("run", help="Run Zenv file")
+    run_parser.add_argument("file", help=".zv file")
+    run_parser.add_argument("args", nargs="*", help="Arguments")
+
+def _add_transpile_parser(subparsers, action=None):
+    transpile_parser = subparsers.add_parser("transpile", help="Transpile to Python")
+    transpile_parser.add_argument("file", help="Input file")
+    transpile_parser.add_argument("-o", "--output", help="Output file")
+
+def _add_build_parser(subparsers, action=None):
+    build_parser = subparsers.add_parser("build", help="Build package")
+    build_parser.add_argument("--n", dest="name", help="Package name")
+    build_parser.add_argument("-f", "--file", default="package.zcf", help="Manifest file")
+    build_parser.add_argument("-o", "--output", default="dist", help="Output directory")
+
+# Actions de pkg/hub : (nom, aide, argument positionnel éventuel)
+_PKG_ACTIONS = (
+    ("install", "Install packages", ("package", {"nargs": "+", "help": "Package names"})),
+    ("list", "List packages", None),
+    ("remove", "Remove package", ("package", {"help": "Package name"})),
+)
+
+_HUB_ACTIONS = (
+    ("status", "Check hub status", None),
+    ("login", "Login to hub", ("token", {"help": "Auth token"})),
+    ("logout", "Logout", None),
+    ("search", "Search packages", ("query", {"nargs": "+", "help": "Search terms"})),
+    ("publish", "Publish package", ("file", {"help": "Package file"})),
+)
+
+def _add_actions(parser, dest, actions, action=None):
+    sub = parser.add_subparsers(dest=dest)
+    # Action connue : ne déclarer qu'elle ; None : toutes, pour l'aide et les erreurs
+    for name, help_text, argument in actions:
+        if action is None or name == action:
+            action_parser = sub.add_parser(name, help=help_text)
+            if argument:
+                action_parser.add_argument(argument[0], **argument[1])
+
+def _add_pkg_parser(subparsers, action=None):
+    pkg_parser = subparsers.add_parser("pkg", help="Package management")
+    _add_actions(pkg_parser, "pkg_command", _PKG_ACTIONS, action)
+
+def _add_hub_parser(subparsers, action=None):
+    hub_parser = subparsers.add_parser("hub", help="Zenv Hub")
+    _add_actions(hub_parser, "hub_command", _HUB_ACTIONS, action)
+
+def _add_version_parser(subparsers, action=None):
+    subparsers.add_parser("version", help="Show version")
+
+def _add_site_parser(subparsers, action=None):
+    # Installation locale
+    site_parser = subparsers.add_parser("site", help="Install to site directory")
+    site_parser.add_argument("file", help="Package file")
+
+_SUBPARSERS = {
+    "run": _add_run_parser,
+    "transpile": _add_transpile_parser,
+    "build": _add_build_parser,
+    "pkg": _add_pkg_parser,
+    "hub": _add_hub_parser,
+    "version": _add_version_parser,
+    "site": _add_site_parser,
+}
+
+# Commandes dont les actions (pkg install, hub search...) sont construites à la demande
+_NESTED = {
+    "pkg": frozenset(name for name, _, _ in _PKG_ACTIONS),
+    "hub": frozenset(name for name, _, _ in _HUB_ACTIONS),
+}
+
+@functools.lru_cache(maxsize=None)
+def _build_parser(command: Optional[str] = None, action: Optional[str] = None) -> "argparse.ArgumentParser":
+    """Build the parser for one command (or all of them) once per process"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="zenv")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+    for name, add_parser in _SUBPARSERS.items():
+        if command is None or name == command:
+            add_parser(subparsers, action)
+    return parser
 
 class ZenvCLI:
     
+    # Seuls les composants paresseux sont stockés : pas de __dict__ par instance
+    __slots__ = ("_transpiler", "_runtime", "_builder", "_hub")
+    
     def __init__(self):
-        self.transpiler = ZenvTranspiler()
-        self.runtime = ZenvRuntime()
-        self.builder = ZenvBuilder()
-        self.hub = ZenvHubClient()
+        # Components are created on first use so that cheap commands
+        # (version, help) never import the transpiler, builder or hub client
+        self._transpiler = None
+        self._runtime = None
+        self._builder = None
+        self._hub = None
+    
+    @property
+    def transpiler(self):
+        if self._transpiler is None:
+            from .transpiler import ZenvTranspiler
+            self._transpiler = ZenvTranspiler()
+        return self._transpiler
+    
+    @property
+    def runtime(self):
+        if self._runtime is None:
+            from .runtime import ZenvRuntime
+            self._runtime = ZenvRuntime()
+        return self._runtime
+    
+    @property
+    def builder(self):
+        if self._builder is None:
+            from .builder import ZenvBuilder
+            self._builder = ZenvBuilder()
+        return self._builder
+    
+    @property
+    def hub(self):
+        if self._hub is None:
+            from .utils.hub_client import ZenvHubClient
+            self._hub = ZenvHubClient()
+        return self._hub
         
     def run(self, args: List[str]) -> int:
-        parser = argparse.ArgumentParser(prog="zenv")
-        subparsers = parser.add_subparsers(dest="command", help="Commands")
-        
-        # Commande run
-        run_parser = subparsers.add_parser("run", help="Run Zenv file")
-        run_parser.add_argument("file", help=".zv file")
-        run_parser.add_argument("args", nargs="*", help="Arguments")
-        
-        # Commande transpile
-        transpile_parser = subparsers.add_parser("transpile", help="Transpile to Python")
-        transpile_parser.add_argument("file", help="Input file")
-        transpile_parser.add_argument("-o", "--output", help="Output file")
-        
-        # Commande build
-        build_parser = subparsers.add_parser("build", help="Build package")
-        build_parser.add_argument("--n", dest="name", help="Package name")
-        build_parser.add_argument("-f", "--file", default="package.zcf", help="Manifest file")
-        build_parser.add_argument("-o", "--output", default="dist", help="Output directory")
-        
-        # Commande pkg
-        pkg_parser = subparsers.add_parser("pkg", help="Package management")
-        pkg_sub = pkg_parser.add_subparsers(dest="pkg_command")
-        
-        pkg_sub.add_parser("install", help="Install package").add_argument("package", help="Package name")
-        pkg_sub.add_parser("list", help="List packages")
-        pkg_sub.add_parser("remove", help="Remove package").add_argument("package", help="Package name")
-        
-        # Commande hub
-        hub_parser = subparsers.add_parser("hub", help="Zenv Hub")
-        hub_sub = hub_parser.add_subparsers(dest="hub_command")
-        
-        hub_sub.add_parser("status", help="Check hub status")
-        hub_sub.add_parser("login", help="Login to hub").add_argument("token", help="Auth token")
-        hub_sub.add_parser("logout", help="Logout")
-        hub_sub.add_parser("search", help="Search packages").add_argument("query", help="Search query")
-        hub_sub.add_parser("publish", help="Publish package").add_argument("file", help="Package file")
-        
-        # Commande version
-        subparsers.add_parser("version", help="Show version")
-        
-        # Commande site (installation locale)
-        site_parser = subparsers.add_parser("site", help="Install to site directory")
-        site_parser.add_argument("file", help="Package file")
-        
-        if not args:
-            parser.print_help()
+        if not args or args == ["-h"] or args == ["--help"]:
+            if _terminal_columns() >= _HELP_TEXT_COLUMNS:
+                print(_HELP_TEXT)
+            else:
+                _build_parser().print_help()
             return 0
         
-        parsed = parser.parse_args(args)
+        result = self._fast_dispatch(args)
+        if result is not None:
+            return result
         
-        if parsed.command == "run":
-            return self._cmd_run(parsed.file, parsed.args)
-        elif parsed.command == "transpile":
-            return self._cmd_transpile(parsed.file, parsed.output)
-        elif parsed.command == "build":
-            return self._cmd_build(parsed.name, parsed.file, parsed.output)
-        elif parsed.command == "pkg":
-            return self._cmd_pkg(parsed)
-        elif parsed.command == "hub":
-            return self._cmd_hub(parsed)
-        elif parsed.command == "version":
-            print(f"Zenv v{__version__}")
-            return 0
-        elif parsed.command == "site":
-            return self._cmd_site(parsed.file)
-        else:
-            parser.print_help()
+        # Commande connue : ne construire que son sous-parseur
+        command = args[0] if args[0] in _SUBPARSERS else None
+        # Seule une action connue entre dans la clé du cache : une faute de frappe
+        # construit toutes les actions (pour le message d'erreur) sous la clé None
+        action = None
+        if command in _NESTED and len(args) > 1 and args[1] in _NESTED[command]:
+            action = args[1]
+        parsed = _build_parser(command, action).parse_args(args)
+        
+        handler = self._COMMANDS.get(parsed.command)
+        if handler is None:
+            _build_parser().print_help()
             return 1
+        return handler(self, parsed)
+    
+    def _fast_dispatch(self, args: List[str]) -> Optional[int]:
+        """Formes courantes traitées sans argparse ; None -> parseur complet"""
+        # Toute option (-h, --help, -o...) passe par argparse
+        if any(arg.startswith('-') for arg in args):
+            return None
+        command, rest = args[0], args[1:]
+        if command == "version" and not rest:
+            return self._cmd_version()
+        if command == "run" and rest:
+            return self._cmd_run(rest[0], rest[1:])
+        if command == "pkg" and rest == ["list"]:
+            return self._list_packages()
+        if command == "pkg" and len(rest) == 2 and rest[0] == "remove":
+            return self._remove_package(rest[1])
+        return None
+    
+    # Commande -> adaptateur (self, parsed), construit une seule fois
+    _COMMANDS = {
+        "run": lambda self, parsed: self._cmd_run(parsed.file, parsed.args),
+        "transpile": lambda self, parsed: self._cmd_transpile(parsed.file, parsed.output),
+        "build": lambda self, parsed: self._cmd_build(parsed.name, parsed.file, parsed.output),
+        "pkg": lambda self, parsed: self._cmd_pkg(parsed),
+        "hub": lambda self, parsed: self._cmd_hub(parsed),
+        "version": lambda self, parsed: self._cmd_version(),
+        "site": lambda self, parsed: self._cmd_site(parsed.file),
+    }
+    
+    def _cmd_version(self) -> int:
+        print(f"Zenv v{__version__}")
+        return 0
     
     def _cmd_run(self, file: str, args: List[str]) -> int:
-        if not os.path.exists(file):
-            print(f"❌ File not found: {file}")
-            return 1
-        
+        # ZenvRuntime.execute vérifie déjà l'existence du fichier
         return self.runtime.execute(file, args)
     
     def _cmd_transpile(self, file: str, output: Optional[str]) -> int:
@@ -114,24 +269,7 @@ class ZenvCLI:
         if name:
             # Créer un manifeste simple
             with open("package.zcf", "w") as f:
-                f.write(f"""[Zenv]
-name = {name}
-version = 1.0.0
-author = Zenv User
-description = A Zenv package
-
-[File-build]
-files = *.zv
-        *.py
-        README.md
-        LICENSE*
-
-[docs]
-description = README.md
-
-[license]
-file = LICENSE*
-""")
+                f.write(_MANIFEST_TEMPLATE.format_map({'name': name}))
             manifest = "package.zcf"
         
         result = self.builder.build(manifest, output)
@@ -139,7 +277,12 @@ file = LICENSE*
     
     def _cmd_pkg(self, parsed):
         if parsed.pkg_command == "install":
-            return self._install_package(parsed.package)
+            # Installations successives sur la même session HTTP et le même catalogue
+            failed = []
+            for name in parsed.package:
+                if self._install_package(name) != 0:
+                    failed.append(name)
+            return 1 if failed else 0
         elif parsed.pkg_command == "list":
             return self._list_packages()
         elif parsed.pkg_command == "remove":
@@ -168,13 +311,13 @@ file = LICENSE*
             print("✅ Logged out")
             return 0
         elif parsed.hub_command == "search":
-            results = self.hub.search_packages(parsed.query)
-            if results:
-                print(f"🔍 Found {len(results)} packages:")
-                for pkg in results:
-                    print(f"  • {pkg['name']} v{pkg.get('version', '?')} - {pkg.get('description', '')[:50]}")
-            else:
-                print("🔍 No packages found")
+            # Plusieurs termes : une seule requête au hub, filtrée par terme
+            if len(parsed.query) > 1:
+                for query, results in self.hub.batch_search(parsed.query).items():
+                    print(f"🔍 {query}:")
+                    self._print_search_results(results)
+                return 0
+            self._print_search_results(self.hub.search_packages(parsed.query[0]))
             return 0
         elif parsed.hub_command == "publish":
             if self.hub.upload_package(parsed.file):
@@ -185,13 +328,42 @@ file = LICENSE*
             print(f"❌ Unknown hub command: {parsed.hub_command}")
             return 1
     
+    def _print_search_results(self, results: List[Dict[str, Any]]) -> None:
+        if results:
+            # Une seule écriture pour tout le tableau
+            lines = [f"🔍 Found {len(results)} packages:"]
+            for pkg in results:
+                get = pkg.get
+                desc = get('description', '')
+                if len(desc) > 50:
+                    desc = desc[:47] + '...'
+                lines.append(f"  • {pkg['name']} v{get('version', '?')} - {desc}")
+            print("\n".join(lines))
+        else:
+            print("🔍 No packages found")
+    
     def _cmd_site(self, package_file: str) -> int:
         """Installer un package localement"""
-        if not os.path.exists(package_file):
+        # Ouvrir directement plutôt que tester l'existence (un seul appel système)
+        try:
+            package_fp = open(package_file, 'rb')
+        except FileNotFoundError:
             print(f"❌ File not found: {package_file}")
             return 1
+        except OSError as e:
+            print(f"❌ Installation error: {e}")
+            return 1
         
         print(f"📦 Installing local package: {package_file}")
+        with package_fp:
+            return self._install_archive(package_fp, package_file)
+    
+    def _install_archive(self, archive: IO[bytes], package_file: str) -> int:
+        """Installer une archive déjà ouverte (fichier local ou téléchargement)"""
+        import shutil
+        import subprocess
+        import tempfile
+        from .utils import archive as archive_io, jsonio
         
         # Créer le dossier site
         site_dir = Path("/usr/bin/zenv-site/c82")
@@ -206,16 +378,15 @@ file = LICENSE*
         zenv_bin_path.mkdir(parents=True, exist_ok=True)
         
         try:
-            # Extraire le nom du package
-            with tarfile.open(package_file, 'r:gz') as tar:
-                # Chercher metadata.json
+            # Extraire en une seule passe (mode flux) dans un dossier de travail,
+            # puis lire metadata.json depuis le disque pour nommer le package
+            staging_dir = Path(tempfile.mkdtemp(prefix=".install-", dir=site_dir))
+            try:
+                metadata_name = archive_io.extract(archive, staging_dir)
+                
                 metadata = None
-                for member in tar.getmembers():
-                    if member.name.endswith('metadata.json'):
-                        f = tar.extractfile(member)
-                        if f:
-                            metadata = json.load(f)
-                            break
+                if metadata_name:
+                    metadata = jsonio.loads((staging_dir / metadata_name).read_bytes())
                 
                 if metadata:
                     package_name = metadata.get('name', Path(package_file).stem)
@@ -223,96 +394,107 @@ file = LICENSE*
                     package_name = Path(package_file).stem.replace('.zv', '')
                 
                 package_dir = site_dir / package_name
-                if package_dir.exists():
+                try:
                     shutil.rmtree(package_dir)
-                package_dir.mkdir()
-                
-                # Extraire
-                tar.extractall(package_dir)
-                
-                # Vérifier si le package a un setup.py et essayer pip install
-                setup_py_path = package_dir / "setup.py"
-                if setup_py_path.exists():
-                    print(f"🔨 Building for pack: {package_name}")
-                    try:
-                        # Essayer d'installer avec pip pour voir s'il y a des entrypoints
-                        result = subprocess.run(
-                            ["pip", "install", str(package_dir)],
-                            capture_output=True,
-                            text=True,
-                            check=False
-                        )
-                        if result.returncode == 0:
-                            print(f"✅ Successfully installed {package_name} with pip")
-                        else:
-                            print(f"⚠️  pip install failed: {result.stderr[:100]}")
-                    except Exception as e:
-                        print(f"⚠️  pip install test failed: {e}")
-                
-                print(f"✅ Installed: {package_name}")
-                print(f"📁 Location: {package_dir}")
-                print(f"📁 Local PATH: {zenv_bin_path}")
-                return 0
-                
+                except FileNotFoundError:
+                    pass
+                staging_dir.rename(package_dir)
+                package_dir.chmod(0o755)
+            except Exception:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            
+            self._update_site_index(site_dir, package_name, metadata)
+            
+            # Vérifier si le package a un setup.py et essayer pip install
+            setup_py_path = package_dir / "setup.py"
+            if setup_py_path.exists():
+                print(f"🔨 Building for pack: {package_name}")
+                try:
+                    # Essayer d'installer avec pip pour voir s'il y a des entrypoints
+                    result = subprocess.run(
+                        ["pip", "install", str(package_dir)],
+                        capture_output=True,
+                        text=True,
+                        check=False
+                    )
+                    if result.returncode == 0:
+                        print(f"✅ Successfully installed {package_name} with pip")
+                    else:
+                        print(f"⚠️  pip install failed: {result.stderr[:100]}")
+                except Exception as e:
+                    print(f"⚠️  pip install test failed: {e}")
+            
+            print(f"✅ Installed: {package_name}")
+            print(f"📁 Location: {package_dir}")
+            print(f"📁 Local PATH: {zenv_bin_path}")
+            return 0
+            
         except Exception as e:
             print(f"❌ Installation error: {e}")
             return 1
     
     def _install_package(self, package_name: str) -> int:
+        import tempfile
         print(f"📦 Installing {package_name}...")
         
-        # Télécharger depuis le hub
-        content = self.hub.download_package(package_name)
-        if not content:
-            print(f"❌ Package not found: {package_name}")
-            return 1
-        
-        # Sauvegarder temporairement
-        with tempfile.NamedTemporaryFile(suffix='.zv', delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
+        # Télécharger en mémoire (sur disque seulement au-delà de 64 Mio),
+        # puis installer directement depuis ce tampon
+        with tempfile.SpooledTemporaryFile(max_size=64 << 20) as tmp:
+            if self.hub.download_package_to(package_name, tmp) is None:
+                print(f"❌ Package not found: {package_name}")
+                return 1
+            tmp.seek(0)
+            return self._install_archive(tmp, f"{package_name}.zv")
+    
+    def _update_site_index(self, site_dir: Path, package_name: str,
+                           metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Ajouter (metadata) ou retirer (None) un package de l'index
         
+        L'index n'est qu'un cache : un échec n'annule pas l'installation ou la
+        suppression, l'index est supprimé pour être reconstruit par `pkg list`.
+        """
+        from .utils import site_index
         try:
-            # Installer localement
-            return self._cmd_site(tmp_path)
-        finally:
-            os.unlink(tmp_path)
+            site_index.update(site_dir, package_name, metadata)
+        except OSError as e:
+            try:
+                site_index.invalidate(site_dir)
+            except OSError:
+                pass
+            print(f"⚠️  Site index not updated: {e}")
     
     def _list_packages(self) -> int:
+        from .utils import site_index
         site_dir = Path("/usr/bin/zenv-site/c82")
-        if not site_dir.exists():
-            print("📦 No packages installed")
-            return 0
-        
-        packages = []
-        for item in site_dir.iterdir():
-            if item.is_dir():
-                meta_file = item / "metadata.json"
-                if meta_file.exists():
-                    try:
-                        with open(meta_file, 'r') as f:
-                            meta = json.load(f)
-                            packages.append(meta)
-                    except:
-                        packages.append({'name': item.name, 'version': 'unknown'})
+        index = site_index.load(site_dir)
+        if index is None:
+            if not site_dir.exists():
+                print("📦 No packages installed")
+                return 0
+            # Index absent ou illisible : parcourir le dossier puis le reconstruire
+            index = site_index.rebuild(site_dir)
+        packages = list(index.values())
         
         if packages:
-            print(f"📦 Installed packages ({len(packages)}):")
-            for pkg in packages:
-                print(f"  • {pkg['name']} v{pkg.get('version', '?')}")
+            lines = [f"📦 Installed packages ({len(packages)}):"]
+            lines.extend(f"  • {pkg['name']} v{pkg.get('version', '?')}" for pkg in packages)
+            print("\n".join(lines))
         else:
             print("📦 No packages installed")
         
         return 0
     
     def _remove_package(self, package_name: str) -> int:
+        import shutil
         site_dir = Path("/usr/bin/zenv-site/c82")
         package_dir = site_dir / package_name
         
-        if not package_dir.exists():
+        try:
+            shutil.rmtree(package_dir)
+        except FileNotFoundError:
             print(f"❌ Package not found: {package_name}")
             return 1
-        
-        shutil.rmtree(package_dir)
+        self._update_site_index(site_dir, package_name)
         print(f"✅ Removed: {package_name}")
         return 0
@@ -1,17 +1,18 @@
-import json
-from pathlib import Path
 from typing import Optional
 
+from ..utils import jsonio
+from ..utils.config import zenv_home
+
 class ZenvAuth:
     
     def __init__(self):
-        self.config_file = Path.home() / ".zenv" / "config.json"
+        self.config_file = zenv_home() / "config.json"
     
     def get_token(self) -> Optional[str]:
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    config = jsonio.loads(f.read())
                     return config.get('token')
             except:
                 pass
@@ -20,8 +21,7 @@ class ZenvAuth:
     def save_token(self, token: str):
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
         config = {'token': token}
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        jsonio.dump(config, self.config_file, indent=True)
     
     def clear_token(self):
         if self.config_file.exists():
@@ -1,17 +1,29 @@
-import requests
-import json
-from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from ..utils.config import zenv_home
+
+if TYPE_CHECKING:
+    import requests
 
 class ZenvHubClient:
     
     def __init__(self, base_url: str = "https://zenv-hub.onrender.com"):
         self.base_url = base_url
-        self.token_file = Path.home() / ".zenv" / "token"
+        self.token_file = zenv_home() / "token"
+        self._session: Optional["requests.Session"] = None
+    
+    @property
+    def session(self) -> "requests.Session":
+        """Shared HTTP session so every call reuses one TCP/TLS connection"""
+        if self._session is None:
+            from ..utils.http import new_session
+            # The health probe fails fast, without retries
+            self._session = new_session(f"{self.base_url}/api/health")
+        return self._session
     
     def check_status(self) -> bool:
         try:
-            response = requests.get(f"{self.base_url}/api/health", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/health", timeout=5)
             return response.status_code == 200
         except:
             return False
@@ -34,7 +46,7 @@ class ZenvHubClient:
     
     def search(self, query: str) -> List[Dict]:
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/packages/search",
                 params={'q': query},
                 headers=self._get_headers()
@@ -47,22 +59,21 @@ class ZenvHubClient:
     
     def install_package(self, package_name: str, version: str = "latest") -> bool:
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/packages/download/{package_name}/{version}",
                 headers=self._get_headers()
             )
             
             if response.status_code == 200:
-                packages_dir = Path.home() / ".zenv" / "packages" / package_name
+                packages_dir = zenv_home() / "packages" / package_name
                 packages_dir.mkdir(parents=True, exist_ok=True)
                 
                 package_file = packages_dir / f"{package_name}.zcf.gz"
                 with open(package_file, 'wb') as f:
                     f.write(response.content)
                 
-                import tarfile
-                with tarfile.open(package_file, "r:gz") as tar:
-                    tar.extractall(packages_dir)
+                from ..utils import archive
+                archive.extract(package_file, packages_dir)
                 
                 package_file.unlink()
                 return True
@@ -74,7 +85,7 @@ class ZenvHubClient:
         try:
             with open(package_file, 'rb') as f:
                 files = {'file': f}
-                response = requests.post(
+                response = self.session.post(
                     f"{self.base_url}/api/packages/upload",
                     files=files,
                     headers=self._get_headers()
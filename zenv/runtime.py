@@ -1,48 +1,114 @@
-import os
 import sys
-import subprocess
-import tempfile
 from pathlib import Path
-from typing import List
-
-from .transpiler import ZenvTranspiler
+from types import ModuleType
+from typing import Callable, List, Optional, Union
 
 class ZenvRuntime:
     
     def __init__(self):
-        self.transpiler = ZenvTranspiler()
+        # Created on first .zv file; running plain .py never loads the transpiler
+        self._transpiler = None
+    
+    @property
+    def transpiler(self):
+        if self._transpiler is None:
+            from .transpiler import ZenvTranspiler
+            self._transpiler = ZenvTranspiler()
+        return self._transpiler
     
-    def execute(self, file_path: str, args: List[str] = None) -> int:
+    def execute(self, file_path: str, args: Optional[List[str]] = None) -> int:
         path = Path(file_path)
         
-        if not path.exists():
+        # EAFP: reading the source reports a missing file, no stat beforehand
+        try:
+            if path.suffix in ['.zv', '.zenv']:
+                return self._execute_zv(path, args or [])
+            else:
+                return self._execute_python(path, args or [])
+        except FileNotFoundError:
             print(f"Error: File not found: {file_path}")
             return 1
-        
-        if path.suffix in ['.zv', '.zenv']:
-            return self._execute_zv(path, args or [])
-        else:
-            return self._execute_python(path, args or [])
+        except OSError as e:
+            print(f"Error: {e}")
+            return 1
     
     def _execute_zv(self, path: Path, args: List[str]) -> int:
+        """Run the transpiled code in-process; __main__.__file__ is the .zv source
+        
+        Anything that re-imports __main__ from its file (multiprocessing's
+        spawn start method, for one) cannot read a .zv file: such programs
+        should be transpiled to .py and run with python.
+        """
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as tmp:
-                python_code = self.transpiler.transpile_file(str(path))
-                tmp.write(python_code)
-                tmp_path = tmp.name
-            
-            result = subprocess.run([sys.executable, tmp_path] + args)
-            os.unlink(tmp_path)
-            return result.returncode
-            
+            python_code = self.transpiler.transpile_file(str(path))
+        except FileNotFoundError:
+            raise
         except Exception as e:
             print(f"Error: {e}")
             return 1
+        return self._run_code(python_code, path, args)
     
     def _execute_python(self, path: Path, args: List[str]) -> int:
+        if path.suffix == '.py':
+            try:
+                return self._run_code(path.read_bytes(), path, args)
+            except IsADirectoryError:
+                pass
+        # Directories, zipapps, .pyc...: let runpy locate and load __main__
+        import runpy
+        return self._run_main(path, args, lambda main: runpy.run_path(str(path), run_name='__main__'))
+    
+    def _run_code(self, source: Union[str, bytes], path: Path, args: List[str]) -> int:
+        """Run source as __main__ in this interpreter, like `python path args`"""
+        import traceback
+        
         try:
-            result = subprocess.run([sys.executable, str(path)] + args)
-            return result.returncode
+            code = compile(source, str(path), 'exec')
+        except (SyntaxError, ValueError):
+            # ValueError: null bytes in the source (Python <= 3.11)
+            traceback.print_exc(limit=0)
+            return 1
+        return self._run_main(path, args, lambda main: exec(code, main.__dict__))
+    
+    def _run_main(self, path: Path, args: List[str], run: Callable[[ModuleType], object]) -> int:
+        import traceback
+        
+        main = ModuleType('__main__')
+        main.__file__ = str(path)
+        saved_argv, saved_path = sys.argv, sys.path[:]
+        saved_main = sys.modules.get('__main__')
+        sys.argv = [str(path)] + args
+        sys.path.insert(0, str(path.resolve().parent))
+        sys.modules['__main__'] = main
+        try:
+            run(main)
+            return 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            print(e.code, file=sys.stderr)
+            return 1
+        except KeyboardInterrupt:
+            return 130
         except Exception as e:
-            print(f"Error: {e}")
+            # Skip runtime and runpy frames so the traceback starts in the user's code
+            internal = {__file__, '<frozen runpy>'}
+            runpy_file = getattr(sys.modules.get('runpy'), '__file__', None)
+            if runpy_file:
+                internal.add(runpy_file)
+            tb = e.__traceback__
+            while tb is not None and tb.tb_frame.f_code.co_filename in internal:
+                tb = tb.tb_next
+            if tb is None:
+                # Raised before any user code ran: unreadable path, no __main__...
+                if isinstance(e, OSError):
+                    raise
+                print(f"Error: {e}")
+            else:
+                traceback.print_exception(type(e), e, tb)
             return 1
+        finally:
+            sys.argv = saved_argv
+            sys.path[:] = saved_path
+            if saved_main is not None:
+                sys.modules['__main__'] = saved_main
@@ -82,6 +82,12 @@ class ZenvTranspiler:
         'in': 'in',
     }
     
+    # One compiled alternation for every keyword that actually changes,
+    # instead of one re.sub() per keyword per line
+    KEYWORD_PATTERN = re.compile(r'\b(' + '|'.join(
+        re.escape(zenv) for zenv, python in ZENV_KEYWORDS.items() if zenv != python
+    ) + r')\b')
+    
     def __init__(self, strict_mode: bool = False):
         self.strict_mode = strict_mode
         self.rules: List[Tuple[Pattern, str]] = []
@@ -107,8 +113,7 @@ class ZenvTranspiler:
                 transpiled_line = pattern.sub(replacement, transpiled_line)
             
             # Remplacer les mots-clés
-            for zenv, python in self.ZENV_KEYWORDS.items():
-                transpiled_line = re.sub(r'\b' + re.escape(zenv) + r'\b', python, transpiled_line)
+            transpiled_line = self.KEYWORD_PATTERN.sub(self._replace_keyword, transpiled_line)
             
             # Préserver l'indentation
             if transpiled_line != line:
@@ -120,15 +125,16 @@ class ZenvTranspiler:
         
         return '\n'.join(result_lines)
     
+    def _replace_keyword(self, match: "re.Match[str]") -> str:
+        return self.ZENV_KEYWORDS[match.group(1)]
+    
     def transpile_file(self, input_file: str, output_file: Optional[str] = None) -> str:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            zv_code = f.read()
+        zv_code = Path(input_file).read_text(encoding='utf-8')
         
         python_code = self.transpile(zv_code)
         
         if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(python_code)
+            Path(output_file).write_text(python_code, encoding='utf-8')
         
         return python_code
     
@@ -1,4 +1,4 @@
 from .logger import Logger
-from .config import Config
+from .config import Config, zenv_home
 
-__all__ = ['Logger', 'Config']
+__all__ = ['Logger', 'Config', 'zenv_home']
@@ -0,0 +1,24 @@
+import os
+import tarfile
+from typing import IO, Any, Dict, Optional, Union
+
+def extract(source: Union[str, "os.PathLike[str]", IO[bytes]], dest: Union[str, "os.PathLike[str]"]) -> Optional[str]:
+    """Extract a .tar.gz into dest in one streaming pass (no member index)
+
+    source is a path or a binary file object. Returns the name of the first
+    metadata.json member, or None when the archive has none.
+    """
+    # The 'data' filter (3.12, backported to 3.8+) rejects unsafe members
+    extract_kwargs: Dict[str, Any] = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+    if isinstance(source, (str, os.PathLike)):
+        tar = tarfile.open(source, mode='r|gz', bufsize=1 << 20)
+    else:
+        tar = tarfile.open(fileobj=source, mode='r|gz', bufsize=1 << 20)
+    
+    metadata_name = None
+    with tar:
+        for member in tar:
+            if metadata_name is None and member.isfile() and member.name.endswith('metadata.json'):
+                metadata_name = member.name
+            tar.extract(member, dest, **extract_kwargs)
+    return metadata_name
@@ -1,30 +1,36 @@
-import json
+import functools
 from pathlib import Path
 from typing import Dict, Any
 
+from . import jsonio
+
+@functools.lru_cache(maxsize=None)
+def zenv_home() -> Path:
+    """~/.zenv, resolved once per process"""
+    return Path.home() / ".zenv"
+
 class Config:
     
     def __init__(self, config_file: str = None):
         if config_file:
             self.config_file = Path(config_file)
         else:
-            self.config_file = Path.home() / ".zenv" / "config.json"
+            self.config_file = zenv_home() / "config.json"
         
         self.data = self._load()
     
     def _load(self) -> Dict[str, Any]:
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    return jsonio.loads(f.read())
             except:
                 pass
         return {}
     
     def save(self):
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.config_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        jsonio.dump(self.data, self.config_file, indent=True)
     
     def get(self, key: str, default: Any = None) -> Any:
         return self.data.get(key, default)
@@ -0,0 +1,26 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
+
+# Gateway errors from the hub's proxy while the service wakes up
+RETRY_STATUSES = (502, 503, 504)
+
+def new_session(*no_retry_prefixes: str) -> "requests.Session":
+    """Shared HTTP session: one connection pool, one retry policy for both hub clients
+
+    Only connection failures and gateway errors on idempotent requests are
+    retried, once; a timed-out read is never replayed. URLs starting with one
+    of no_retry_prefixes (health probes) fail on the first error.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    retry = Retry(connect=1, read=0, status=1, status_forcelist=RETRY_STATUSES,
+                  backoff_factor=0.3, raise_on_status=False)
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+    for prefix in no_retry_prefixes:
+        session.mount(prefix, HTTPAdapter(max_retries=0))
+    return session
@@ -1,38 +1,63 @@
-import requests
-import json
 import os
 import time
-from pathlib import Path
-from typing import Dict, List, Optional
-import tempfile
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Optional
+
+from . import jsonio
+from .config import zenv_home
+
+if TYPE_CHECKING:
+    import requests
 
 class ZenvHubClient:
     
+    STATUS_TTL = 30
+    
     def __init__(self):
         self.base_url = "https://zenv-hub.onrender.com"
-        self.config_dir = Path.home() / ".zenv"
+        self.config_dir = zenv_home()
         self.config_dir.mkdir(exist_ok=True)
         self.token_file = self.config_dir / "token.json"
         self.config_file = self.config_dir / "config.json"
+        self._packages = None
+        self._session: Optional["requests.Session"] = None
+        self._status = None
+        # token.json n'est lu qu'au premier get_token()
+        self._token: Optional[str] = None
+        self._token_read = False
         
+    @property
+    def session(self) -> "requests.Session":
+        """Session HTTP partagée : une seule poignée de main TCP/TLS par client"""
+        if self._session is None:
+            from .http import new_session
+            # La sonde de santé échoue vite, sans nouvel essai
+            self._session = new_session(f"{self.base_url}/api/health")
+        return self._session
+    
     def check_status(self) -> bool:
+        # Résultat gardé STATUS_TTL secondes : une sonde par commande suffit
+        now = time.monotonic()
+        if self._status is not None and now - self._status[0] < self.STATUS_TTL:
+            return self._status[1]
         try:
-            response = requests.get(f"{self.base_url}/api/health", timeout=10)
-            return response.status_code == 200
+            response = self.session.get(f"{self.base_url}/api/health", timeout=10)
+            online = response.status_code == 200
         except:
-            return False
+            online = False
+        self._status = (now, online)
+        return online
     
     def login(self, token: str) -> bool:
         try:
             # Vérifier directement le format du token
             if token.startswith('zenv_'):
                 # Sauvegarder le token
-                with open(self.token_file, 'w') as f:
-                    json.dump({
-                        'token': token,
-                        'user': {'id': '1', 'username': 'user', 'role': 'user'},
-                        'login_time': time.time()
-                    }, f, indent=2)
+                jsonio.dump({
+                    'token': token,
+                    'user': {'id': '1', 'username': 'user', 'role': 'user'},
+                    'login_time': time.time()
+                }, self.token_file, indent=True)
+                self._token, self._token_read = token, True
                 return True
             return False
         except Exception as e:
@@ -40,21 +65,27 @@ class ZenvHubClient:
             return False
     
     def logout(self):
-        if self.token_file.exists():
+        try:
             self.token_file.unlink()
+        except FileNotFoundError:
+            pass
+        self._token, self._token_read = None, True
     
     def is_logged_in(self) -> bool:
-        return self.token_file.exists()
+        return self.get_token() is not None
     
     def get_token(self) -> Optional[str]:
-        if self.token_file.exists():
+        # Lu une seule fois par client ; login/logout tiennent le cache à jour
+        if not self._token_read:
+            self._token_read = True
             try:
-                with open(self.token_file, 'r') as f:
-                    data = json.load(f)
-                    return data.get('token')
+                with open(self.token_file, 'rb') as f:
+                    token = jsonio.loads(f.read()).get('token')
+                if isinstance(token, str):
+                    self._token = token
             except:
                 pass
-        return None
+        return self._token
     
     def _get_headers(self) -> Dict:
         headers = {'Content-Type': 'application/json'}
@@ -63,31 +94,51 @@ class ZenvHubClient:
             headers['Authorization'] = f'Token {token}'
         return headers
     
-    def search_packages(self, query: str = "") -> List[Dict]:
-        try:
-            response = requests.get(
+    def _fetch_packages(self) -> List[Dict]:
+        """Catalogue du hub, récupéré une seule fois par client"""
+        if self._packages is None:
+            response = self.session.get(
                 f"{self.base_url}/api/packages",
                 headers=self._get_headers(),
                 timeout=15
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                packages = data.get('packages', [])
-                
-                if query:
-                    query_lower = query.lower()
-                    packages = [
-                        pkg for pkg in packages 
-                        if query_lower in pkg.get('name', '').lower() or 
-                        query_lower in pkg.get('description', '').lower()
-                    ]
-                
-                return packages
+            if response.status_code != 200:
+                if response.status_code >= 500:
+                    self._status = None
+                return []
+            self._packages = response.json().get('packages', [])
+        return self._packages
+    
+    @staticmethod
+    def _filter_packages(packages: List[Dict], query: str) -> List[Dict]:
+        if not query:
+            return packages
+        query_lower = query.lower()
+        return [
+            pkg for pkg in packages 
+            if query_lower in pkg.get('name', '').lower() or 
+            query_lower in pkg.get('description', '').lower()
+        ]
+    
+    def search_packages(self, query: str = "") -> List[Dict]:
+        try:
+            return self._filter_packages(self._fetch_packages(), query)
         except Exception as e:
             print(f"Search error: {e}")
         return []
     
+    def batch_search(self, queries: List[str], limit: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """Plusieurs recherches servies par un seul aller-retour au hub
+
+        Sans limit, chaque terme renvoie tous ses résultats, comme search_packages.
+        """
+        try:
+            packages = self._fetch_packages()
+        except Exception as e:
+            print(f"Search error: {e}")
+            return {query: [] for query in queries}
+        return {query: self._filter_packages(packages, query)[:limit] for query in queries}
+    
     def upload_package(self, package_file: str) -> bool:
         if not self.is_logged_in():
             print("❌ Not logged in. Use: zenv hub login <token>")
@@ -120,7 +171,7 @@ class ZenvHubClient:
                     'description': f'Package {name} v{version}'
                 }
                 
-                response = requests.post(
+                response = self.session.post(
                     f"{self.base_url}/api/packages/upload",
                     files=files,
                     data=data,
@@ -129,6 +180,7 @@ class ZenvHubClient:
                 )
                 
                 if response.status_code == 201:
+                    self._packages = None
                     print(f"✅ Package published: {name} v{version}")
                     return True
                 else:
@@ -144,58 +196,76 @@ class ZenvHubClient:
             print(f"❌ Upload error: {e}")
             return False
     
+    def _open_download(self, package_name: str, version: str) -> Optional["requests.Response"]:
+        """Résoudre le package dans le catalogue et ouvrir le flux de téléchargement"""
+        print(f"⬇️  Downloading {package_name}...")
+        
+        # Chercher le package
+        packages = self.search_packages(package_name)
+        target_package = None
+        
+        for pkg in packages:
+            if pkg['name'] == package_name:
+                if version == "latest":
+                    target_package = pkg
+                    break
+                elif pkg.get('version') == version:
+                    target_package = pkg
+                    break
+        
+        if not target_package:
+            print(f"❌ Package not found: {package_name}")
+            # Afficher les packages disponibles
+            if packages:
+                print("📦 Available packages:")
+                for pkg in packages[:5]:  # Afficher les 5 premiers
+                    print(f"  • {pkg['name']} v{pkg.get('version', '?')}")
+            return None
+        
+        # Construire l'URL de téléchargement
+        download_version = target_package.get('version', version)
+        download_url = f"{self.base_url}/api/packages/download/{package_name}/{download_version}"
+        
+        print(f"🔗 Download URL: {download_url}")
+        
+        response = self.session.get(
+            download_url,
+            headers=self._get_headers(),
+            stream=True,
+            timeout=30
+        )
+        
+        if response.status_code != 200:
+            if response.status_code >= 500:
+                self._status = None
+            print(f"❌ Download failed: {response.status_code}")
+            if response.text:
+                print(f"   Error: {response.text[:100]}")
+            return None
+        return response
+    
     def download_package(self, package_name: str, version: str = "latest") -> Optional[bytes]:
+        """Télécharger le package en mémoire (même chemin que download_package_to)"""
+        import io
+        buffer = io.BytesIO()
+        if self.download_package_to(package_name, buffer, version) is None:
+            return None
+        return buffer.getvalue()
+    
+    def download_package_to(self, package_name: str, fp: BinaryIO, version: str = "latest") -> Optional[int]:
+        """Écrire le package dans fp par blocs de 1 Mio ; renvoie le nombre d'octets écrits"""
         try:
-            print(f"⬇️  Downloading {package_name}...")
-            
-            # Chercher le package
-            packages = self.search_packages(package_name)
-            target_package = None
-            
-            for pkg in packages:
-                if pkg['name'] == package_name:
-                    if version == "latest":
-                        target_package = pkg
-                        break
-                    elif pkg.get('version') == version:
-                        target_package = pkg
-                        break
-            
-            if not target_package:
-                print(f"❌ Package not found: {package_name}")
-                # Afficher les packages disponibles
-                if packages:
-                    print("📦 Available packages:")
-                    for pkg in packages[:5]:  # Afficher les 5 premiers
-                        print(f"  • {pkg['name']} v{pkg.get('version', '?')}")
+            response = self._open_download(package_name, version)
+            if response is None:
                 return None
             
-            # Construire l'URL de téléchargement
-            download_version = target_package.get('version', version)
-            download_url = f"{self.base_url}/api/packages/download/{package_name}/{download_version}"
-            
-            print(f"🔗 Download URL: {download_url}")
-            
-            response = requests.get(
-                download_url,
-                headers=self._get_headers(),
-                stream=True,
-                timeout=30
-            )
+            size = 0
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                fp.write(chunk)
+                size += len(chunk)
             
-            if response.status_code == 200:
-                content = b''
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        content += chunk
-                
-                print(f"✅ Downloaded: {len(content)} bytes")
-                return content
-            else:
-                print(f"❌ Download failed: {response.status_code}")
-                if response.text:
-                    print(f"   Error: {response.text[:100]}")
-                return None
+            print(f"✅ Downloaded: {size} bytes")
+            return size
         except Exception as e:
             print(f"❌ Download error: {e}")
             return None
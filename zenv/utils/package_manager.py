@@ -1,12 +1,13 @@
+import os
 import shutil
-import json
-import tarfile
 import requests
 from pathlib import Path
 from typing import Dict, List, Optional
 import subprocess
 import sys
 
+from . import archive, jsonio, site_index
+
 class PackageManager:
     
     def __init__(self):
@@ -27,8 +28,9 @@ class PackageManager:
             package_dir = self.site_dir / package_name
             package_dir.mkdir(exist_ok=True)
             
-            with tarfile.open(package_file, "r:gz") as tar:
-                tar.extractall(package_dir)
+            archive.extract(package_file, package_dir)
+            
+            self._invalidate_index()
             
             # Install Python dependencies
             self._install_python_deps(package_dir)
@@ -40,6 +42,10 @@ class PackageManager:
             print(f"❌ Installation error: {e}")
             return False
     
+    def _invalidate_index(self):
+        # The CLI rebuilds the index from the directories on the next `pkg list`
+        site_index.invalidate(self.site_dir)
+    
     def _download_package(self, package_name: str, version: str) -> Optional[Path]:
         try:
             url = f"{self.hub_url}/api/packages/download/{package_name}/{version}"
@@ -48,7 +54,7 @@ class PackageManager:
             if response.status_code == 200:
                 temp_file = Path(f"/tmp/{package_name}.zc.gs")
                 with open(temp_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
+                    for chunk in response.iter_content(chunk_size=1 << 20):
                         f.write(chunk)
                 return temp_file
         except Exception as e:
@@ -66,31 +72,38 @@ class PackageManager:
         # Check for dependencies in metadata
         meta_file = package_dir / "metadata.json"
         if meta_file.exists():
-            with open(meta_file) as f:
-                metadata = json.load(f)
+            with open(meta_file, 'rb') as f:
+                metadata = jsonio.loads(f.read())
                 deps = metadata.get('dependencies', {}).get('py', {})
                 if deps:
-                    for dep, ver in deps.items():
-                        if ver == "latest":
-                            subprocess.run([sys.executable, "-m", "pip", "install", dep])
-                        else:
-                            subprocess.run([sys.executable, "-m", "pip", "install", f"{dep}=={ver}"])
+                    # One pip run resolves and downloads every dependency together
+                    specs = [dep if ver == "latest" else f"{dep}=={ver}" for dep, ver in deps.items()]
+                    result = subprocess.run([sys.executable, "-m", "pip", "install"] + specs)
+                    if result.returncode != 0 and len(specs) > 1:
+                        # pip installs nothing when one requirement fails; retry them
+                        # one by one so the others still get installed
+                        print("⚠️  Batched install failed, installing dependencies one by one...")
+                        for spec in specs:
+                            subprocess.run([sys.executable, "-m", "pip", "install", spec])
     
     def list_packages(self) -> List[Dict]:
         packages = []
-        for package_dir in self.site_dir.iterdir():
-            if package_dir.is_dir():
-                meta_file = package_dir / "metadata.json"
-                if meta_file.exists():
-                    with open(meta_file) as f:
-                        metadata = json.load(f)
-                        packages.append(metadata)
+        with os.scandir(self.site_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    with open(os.path.join(entry.path, "metadata.json"), 'rb') as f:
+                        packages.append(jsonio.loads(f.read()))
+                except FileNotFoundError:
+                    pass
         return packages
     
     def remove(self, package_name: str) -> bool:
         package_dir = self.site_dir / package_name
         if package_dir.exists():
             shutil.rmtree(package_dir)
+            self._invalidate_index()
             print(f"✅ Removed: {package_name}")
             return True
         else:
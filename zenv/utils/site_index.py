@@ -0,0 +1,111 @@
+import contextlib
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from . import jsonio
+
+if sys.platform == "win32":
+    import msvcrt
+    
+    def _lock(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+    
+    def _unlock(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+    
+    def _lock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    
+    def _unlock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+# Installed packages (directory name -> metadata), kept next to the packages
+INDEX_NAME = "index.json"
+LOCK_NAME = ".index.lock"
+
+@contextlib.contextmanager
+def locked(site_dir: Path) -> Iterator[None]:
+    """Hold an exclusive lock on the site index (flock, msvcrt on Windows)"""
+    with open(site_dir / LOCK_NAME, 'a+b') as lock:
+        # msvcrt locks a byte range from the current position
+        lock.seek(0)
+        _lock(lock.fileno())
+        try:
+            yield
+        finally:
+            lock.seek(0)
+            _unlock(lock.fileno())
+
+def load(site_dir: Path) -> Optional[Dict[str, Any]]:
+    """The index, or None when it is missing or unreadable"""
+    try:
+        index = jsonio.loads((site_dir / INDEX_NAME).read_bytes())
+    except (OSError, ValueError):
+        return None
+    return index if isinstance(index, dict) else None
+
+def scan(site_dir: Path) -> Dict[str, Any]:
+    """Read metadata.json from every package directory"""
+    index: Dict[str, Any] = {}
+    with os.scandir(site_dir) as entries:
+        for entry in entries:
+            # Dot entries are in-progress installs (.install-*) or the lock file
+            if entry.name.startswith('.') or not entry.is_dir(follow_symlinks=False):
+                continue
+            try:
+                with open(os.path.join(entry.path, "metadata.json"), 'rb') as f:
+                    index[entry.name] = jsonio.loads(f.read())
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError):
+                index[entry.name] = {'name': entry.name, 'version': 'unknown'}
+    return index
+
+def rebuild(site_dir: Path) -> Dict[str, Any]:
+    """Scan the site directory and write the index, under the lock"""
+    try:
+        with locked(site_dir):
+            # Another process may have rebuilt it while we waited
+            index = load(site_dir)
+            if index is None:
+                index = scan(site_dir)
+                jsonio.dump(index, site_dir / INDEX_NAME, mode=0o644)
+            return index
+    except OSError:
+        # Read-only site directory: list without caching
+        return scan(site_dir)
+
+def update(site_dir: Path, package_name: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+    """Add (metadata) or drop (None) one package; no-op until the index exists"""
+    index_path = site_dir / INDEX_NAME
+    with locked(site_dir):
+        try:
+            index = jsonio.loads(index_path.read_bytes())
+        except FileNotFoundError:
+            # The next `pkg list` builds it from the directories
+            return
+        except ValueError:
+            index_path.unlink()
+            return
+        if not isinstance(index, dict):
+            # Same rule as load(): anything but an object is treated as corrupt
+            index_path.unlink()
+            return
+
+        if metadata:
+            index[package_name] = metadata
+        else:
+            index.pop(package_name, None)
+        jsonio.dump(index, index_path, mode=0o644)
+
+def invalidate(site_dir: Path) -> None:
+    """Drop the index so that the next listing rebuilds it"""
+    with locked(site_dir):
+        try:
+            (site_dir / INDEX_NAME).unlink()
+        except FileNotFoundError:
+            pass